@@ -1 +1 @@
-from .graph import Graph, invert, compose, lift
+from .graph import Graph, EdgeList, invert, compose, lift
@@ -1,18 +1,278 @@
+import json
+from collections import defaultdict
 from collections.abc import Iterable
+from dataclasses import dataclass, field
+from itertools import chain
 
+# the number of multi-label queries whose merged node buckets a Graph keeps; each entry is O(|V|)
+_BUCKET_CACHE_SIZE = 32
 
-def invert(edge_list, new_label=None):
+
+@dataclass
+class EdgeList:
+	"""
+	A column-oriented list of edges, stored as parallel lists instead of one dict per edge.
+
+	Attributes:
+		sources (list): The source node ids.
+		targets (list): The target node ids.
+		labels (list): The edge labels.
+	"""
+	sources: list = field(default_factory=list)
+	targets: list = field(default_factory=list)
+	labels: list = field(default_factory=list)
+
+	@classmethod
+	def from_dicts(cls, edge_list):
+		"""
+		Builds an EdgeList from a list of edge dicts. Properties other than source, target and label are dropped.
+
+		Args:
+			edge_list (list): A list of edges.
+
+		Returns:
+			EdgeList: The edges in column form.
+		"""
+		edges = cls()
+		for edge in edge_list:
+			edges.sources.append(edge['source'])
+			edges.targets.append(edge['target'])
+			edges.labels.append(edge.get('label', 'edge'))
+		return edges
+
+	def to_dicts(self):
+		"""
+		Materializes the edges as a list of edge dicts.
+
+		Returns:
+			list: A list of edges.
+		"""
+		return [{'source': source, 'target': target, 'label': label}
+		        for source, target, label in zip(self.sources, self.targets, self.labels)]
+
+	def __len__(self):
+		return len(self.sources)
+
+
+def _edge_rows(edge_list):
+	"""
+	Iterates over the source, target and label of each edge.
+
+	Args:
+		edge_list (list, EdgeList): A list of edges.
+
+	Returns:
+		Iterable: (source, target, label) tuples.
+	"""
+	if isinstance(edge_list, EdgeList):
+		return zip(edge_list.sources, edge_list.targets, edge_list.labels)
+	return ((edge['source'], edge['target'], edge.get('label', 'edge')) for edge in edge_list)
+
+
+def _index_by_source(edge_list):
+	"""
+	Indexes edges by their source node.
+
+	Args:
+		edge_list (list, EdgeList): A list of edges to index.
+
+	Returns:
+		defaultdict: A mapping from source node ids to (target, label) tuples of the edges leaving them.
+	"""
+	index = defaultdict(list)
+	for source, target, label in _edge_rows(edge_list):
+		index[source].append((target, label))
+	return index
+
+
+def _index_by_target(edge_list):
+	"""
+	Indexes edges by their target node.
+
+	Args:
+		edge_list (list, EdgeList): A list of edges to index.
+
+	Returns:
+		defaultdict: A mapping from target node ids to (source, label) tuples of the edges entering them.
+	"""
+	index = defaultdict(list)
+	for source, target, label in _edge_rows(edge_list):
+		index[target].append((source, label))
+	return index
+
+
+def _compose_columns(sources, targets, labels, index, new_label=None):
+	"""
+	Joins edge columns against a source index of a second list of edges.
+
+	Args:
+		sources (list): The source node ids of the first list of edges.
+		targets (list): The target node ids of the first list of edges.
+		labels (list): The labels of the first list of edges.
+		index (dict): A source index of the second list of edges, holding (target, label) tuples.
+		new_label (str, optional): A new label for the composed edges. Defaults to None.
+
+	Returns:
+		tuple: The source, target and label columns of the composed edges.
+	"""
+	# one index lookup per edge, rows transposed back into columns
+	rows = [(source1, target2, new_label if new_label else f"{label1},{label2}")
+	        for source1, label1, matches in zip(sources, labels, map(index.get, targets))
+	        if matches
+	        for target2, label2 in matches]
+	if not rows:
+		return [], [], []
+	return tuple(map(list, zip(*rows)))
+
+
+def _lift_columns(sources, targets, labels, index, new_label=None):
+	"""
+	Lifts edge columns through a source index of a second list of edges and back along the inverse of the columns.
+
+	Args:
+		sources (list): The source node ids of the first list of edges.
+		targets (list): The target node ids of the first list of edges.
+		labels (list): The labels of the first list of edges.
+		index (dict): A source index of the second list of edges, holding (target, label) tuples.
+		new_label (str, optional): A new label for the lifted edges. Defaults to None.
+
+	Returns:
+		tuple: The source, target and label columns of the lifted edges.
+	"""
+	by_target = _index_by_target(EdgeList(sources, targets, labels))
+	rows = [(source1, source3, new_label if new_label else f"{label1},{label2},inv_{label3}")
+	        for source1, label1, matches in zip(sources, labels, map(index.get, targets))
+	        if matches
+	        for target2, label2 in matches
+	        for source3, label3 in by_target.get(target2, ())]
+	if not rows:
+		return [], [], []
+	return tuple(map(list, zip(*rows)))
+
+
+def _strongly_connected_components(adjacency):
+	"""
+	Finds the strongly connected components of a graph with Tarjan's algorithm, iteratively.
+
+	Args:
+		adjacency (list): The successor lists of the nodes, which are numbered 0 to len(adjacency) - 1.
+
+	Returns:
+		tuple: The component number of each node, and the list of components in reverse topological order.
+	"""
+	count = len(adjacency)
+	order = [-1] * count
+	low = [0] * count
+	on_stack = [False] * count
+	comp_of = [-1] * count
+	components = []
+	stack = []
+	counter = 0
+	for root in range(count):
+		if order[root] != -1:
+			continue
+		order[root] = low[root] = counter
+		counter += 1
+		stack.append(root)
+		on_stack[root] = True
+		work = [(root, 0)]
+		while work:
+			node, i = work[-1]
+			if i < len(adjacency[node]):
+				work[-1] = (node, i + 1)
+				succ = adjacency[node][i]
+				if order[succ] == -1:
+					order[succ] = low[succ] = counter
+					counter += 1
+					stack.append(succ)
+					on_stack[succ] = True
+					work.append((succ, 0))
+				elif on_stack[succ]:
+					low[node] = min(low[node], order[succ])
+				continue
+			work.pop()
+			if work:
+				parent = work[-1][0]
+				low[parent] = min(low[parent], low[node])
+			if low[node] == order[node]:
+				component = []
+				while True:
+					member = stack.pop()
+					on_stack[member] = False
+					comp_of[member] = len(components)
+					component.append(member)
+					if member == node:
+						break
+				components.append(component)
+	return comp_of, components
+
+
+def _closure_pairs(sources, targets):
+	"""
+	Computes the transitive closure of a relation on its condensation into strongly connected components.
+
+	Args:
+		sources (list): The source node ids of the relation.
+		targets (list): The target node ids of the relation.
+
+	Returns:
+		list: The (source, target) pairs connected by a path of one or more edges.
+	"""
+	node_ids = list(dict.fromkeys([*sources, *targets]))
+	id2int = {node_id: i for i, node_id in enumerate(node_ids)}
+	adjacency = [[] for _ in node_ids]
+	for source, target in zip(sources, targets):
+		adjacency[id2int[source]].append(id2int[target])
+	comp_of, components = _strongly_connected_components(adjacency)
+
+	# reachable components as bitsets; successors always precede in the reverse topological order
+	reach = [0] * len(components)
+	for comp, members in enumerate(components):
+		bits = 0
+		for member in members:
+			for succ in adjacency[member]:
+				succ_comp = comp_of[succ]
+				bits |= (1 << succ_comp) | reach[succ_comp]
+		reach[comp] = bits
+
+	comp_targets = []
+	for bits in reach:
+		reached = []
+		while bits:
+			lowest = bits & -bits
+			reached.extend(node_ids[member] for member in components[lowest.bit_length() - 1])
+			bits ^= lowest
+		comp_targets.append(reached)
+	return [(node_id, target) for node_id in node_ids for target in comp_targets[comp_of[id2int[node_id]]]]
+
+
+def invert(edge_list, new_label=None, inplace=False):
 	"""
 	Inverts the direction of edges in the given edge list.
 
 	Args:
-		edge_list (list): A list of edges to invert.
+		edge_list (list, EdgeList): A list of edges to invert.
 		new_label (str, optional): A new label for the inverted edges. Defaults to None.
+		inplace (bool, optional): Invert the given edges themselves instead of copies, for callers that
+			discard the original list. Do not use it on lists held by a Graph: the Graph's cached indexes
+			and ontology for that label would silently go stale. Defaults to False.
 
 	Returns:
-		list: A list of inverted edges with updated labels.
+		list, EdgeList: A list of inverted edges with updated labels, of the same type as edge_list.
 	"""
 	prefix = "inv_"
+	if isinstance(edge_list, EdgeList):
+		labels = [new_label] * len(edge_list) if new_label else [prefix + label for label in edge_list.labels]
+		if inplace:
+			edge_list.sources, edge_list.targets = edge_list.targets, edge_list.sources
+			edge_list.labels = labels
+			return edge_list
+		return EdgeList(sources=list(edge_list.targets), targets=list(edge_list.sources), labels=labels)
+	if inplace:
+		for edge in edge_list:
+			edge['source'], edge['target'] = edge['target'], edge['source']
+			edge['label'] = new_label if new_label else prefix + edge.get('label', 'edge')
+		return edge_list
 	return [{**edge,
 	         'source': edge['target'],
 	         'target': edge['source'],
@@ -20,68 +280,105 @@ def invert(edge_list, new_label=None):
 	         } for edge in edge_list]
 
 
-def compose(edges1, edges2, new_label=None):
+def compose(edges1, edges2, new_label=None, index=None):
 	"""
 	Composes two lists of edges.
 
 	Args:
-		edges1 (list): The first list of edges.
-		edges2 (list): The second list of edges.
+		edges1 (list, EdgeList): The first list of edges.
+		edges2 (list, EdgeList): The second list of edges.
 		new_label (str, optional): A new label for the composed edges. Defaults to None.
+		index (dict, optional): A prebuilt source index of edges2. Built on the fly if None.
 
 	Returns:
-		list: A list of composed edges.
-	"""
-	mapping = {
-		edge['source']: {
-			'target': edge['target'],
-			'label': edge['label']
-		} for edge in edges2
-	}
-	composed_edges = []
-	for edge in edges1:
-		if edge['target'] in mapping:
-			composed_edges.append({
-				'source': edge['source'],
-				'target': mapping[edge['target']]['target'],
-				'label': new_label if new_label else f"{edge['label']},{mapping[edge['target']]['label']}"
-			})
-	return composed_edges
-
-
-def lift(edges1, edges2, new_label=None):
+		list, EdgeList: A list of composed edges, of the same type as edges1.
+	"""
+	if index is None:
+		index = _index_by_source(edges2)
+	if isinstance(edges1, EdgeList):
+		return EdgeList(*_compose_columns(edges1.sources, edges1.targets, edges1.labels, index, new_label))
+	return [{
+		'source': edge1['source'],
+		'target': target2,
+		'label': new_label if new_label else f"{edge1['label']},{label2}"
+	} for edge1 in edges1 for target2, label2 in index.get(edge1['target'], ())]
+
+
+def lift(edges1, edges2, new_label=None, index=None):
 	"""
 	Lifts relations by composing two lists of edges and their inverses.
 
 	Args:
-		edges1 (list): The first list of edges.
-		edges2 (list): The second list of edges.
+		edges1 (list, EdgeList): The first list of edges.
+		edges2 (list, EdgeList): The second list of edges.
 		new_label (str, optional): A new label for the lifted edges. Defaults to None.
+		index (dict, optional): A prebuilt source index of edges2. Built on the fly if None.
 
 	Returns:
-		list: A list of lifted edges.
+		list, EdgeList: A list of lifted edges, of the same type as edges1.
 	"""
-	return compose(compose(edges1, edges2), invert(edges1), new_label)
+	if index is None:
+		index = _index_by_source(edges2)
+	# composes edges1 with edges2 and the inverse of edges1 in one pass, without the intermediate lists
+	if isinstance(edges1, EdgeList):
+		return EdgeList(*_lift_columns(edges1.sources, edges1.targets, edges1.labels, index, new_label))
+	by_target = _index_by_target(edges1)
+	return [{
+		'source': edge1['source'],
+		'target': source3,
+		'label': new_label if new_label else f"{edge1['label']},{label2},inv_{label3}"
+	} for edge1 in edges1
+		for target2, label2 in index.get(edge1['target'], ())
+		for source3, label3 in by_target.get(target2, ())]
 
 
 class Graph:
 	"""
 	A class to represent a graph with nodes and edges.
 
+	Node labels are indexed when the graph is built, so they are frozen after construction: changing the
+	labels of a node afterwards is not reflected in filter_nodes_by_labels, get_edges_with_node_labels or
+	the ontology.
+
+	Cached per-label data is rebuilt when a label is assigned a new edge list, including directly through
+	edges, but changing a list in place (for example with append) bypasses the cache.
+
 	Attributes:
 		nodes (dict): A dictionary of nodes.
 		edges (dict): A dictionary of edges categorized by labels.
+		compact (bool): Whether the edges of each label are stored as an EdgeList instead of a list of dicts.
 	"""
 
-	def __init__(self, graph_data):
+	def __init__(self, graph_data, compact=False):
 		"""
 		Initializes the Graph with nodes and edges from the provided data.
 
 		Args:
 			graph_data (dict): A dictionary containing graph data with nodes and edges.
+			compact (bool, optional): Store the edges of each label as an EdgeList, keeping only their source,
+				target and label. Defaults to False.
 		"""
+		self.compact = compact
 		self.nodes = {node['data']['id']: node['data'] for node in graph_data['elements']['nodes']}
+		self._nodes_by_label = {}
+		# node label sets as bitmasks over the interned labels
+		self._label_ids = {}
+		self._node_masks = {}
+		for node_id, node in self.nodes.items():
+			mask = 0
+			for label in node.get('labels', ()):
+				self._nodes_by_label.setdefault(label, {})[node_id] = node
+				mask |= 1 << self._label_ids.setdefault(label, len(self._label_ids))
+			self._node_masks[node_id] = mask
+		self._label_pool = list(self._label_ids)
+		# merged node buckets by multi-label query, oldest first; see filter_nodes_by_labels
+		self._bucket_cache = {}
 		self.edges = {}
+		# (edge list, source index) by edge label; see _get_src_index
+		self._src_index = {}
+		# (edge list, ontology entry) by edge label, and label products by packed mask key; see _label_pairs
+		self._ontology = {}
+		self._pair_cache = {}
 		for edge in graph_data['elements']['edges']:
 			if 'label' in edge['data']:
 				label = edge['data']['label']
@@ -90,8 +387,73 @@ class Graph:
 				edge['data']['label'] = label
 
 			if label not in self.edges:
-				self.edges[label] = []
-			self.edges[label].append(edge['data'])
+				self.edges[label] = EdgeList() if compact else []
+			if compact:
+				edge_list = self.edges[label]
+				edge_list.sources.append(edge['data']['source'])
+				edge_list.targets.append(edge['data']['target'])
+				edge_list.labels.append(label)
+			else:
+				self.edges[label].append(edge['data'])
+
+	@classmethod
+	def from_json_file(cls, path, compact=False):
+		"""
+		Loads a graph from a JSON file holding graph data in the format accepted by the constructor.
+		Node ids and labels are decoded into shared string objects, so an id repeated across edges is
+		stored once instead of once per occurrence.
+
+		Args:
+			path (str, os.PathLike): The path of the JSON file.
+			compact (bool, optional): Store the edges of each label as an EdgeList. Defaults to False.
+
+		Returns:
+			Graph: The loaded graph.
+		"""
+		strings = {}
+
+		def share_strings(obj):
+			for key in ('id', 'source', 'target', 'label'):
+				value = obj.get(key)
+				if isinstance(value, str):
+					obj[key] = strings.setdefault(value, value)
+			labels = obj.get('labels')
+			if isinstance(labels, list):
+				obj['labels'] = [strings.setdefault(label, label) if isinstance(label, str) else label
+				                 for label in labels]
+			return obj
+
+		with open(path, encoding='utf-8') as f:
+			return cls(json.load(f, object_hook=share_strings), compact=compact)
+
+	def _get_src_index(self, edge_label):
+		"""
+		Gets the source index of the edges with the specified label, building it on first use and whenever
+		the label has been assigned a different edge list since.
+
+		Args:
+			edge_label (str): The label of the edges to index.
+
+		Returns:
+			dict: A mapping from source node ids to (target, label) tuples of the edges leaving them.
+		"""
+		edge_list = self.edges[edge_label]
+		cached = self._src_index.get(edge_label)
+		if cached is None or cached[0] is not edge_list:
+			cached = self._src_index[edge_label] = (edge_list, _index_by_source(edge_list))
+		return cached[1]
+
+	def _set_edges(self, edge_label, edge_list):
+		"""
+		Saves a list of edges under the specified label and drops any stale index or ontology entry for it.
+
+		Args:
+			edge_label (str): The label to save the edges under.
+			edge_list (list, EdgeList): The list of edges to save.
+		"""
+		self.edges[edge_label] = edge_list
+		self._src_index.pop(edge_label, None)
+		self._ontology.pop(edge_label, None)
 
 	def invert_edges(self, edge_label, new_label=None):
 		"""
@@ -104,7 +466,7 @@ class Graph:
 		if edge_label in self.edges:
 			inverted = invert(self.edges[edge_label], new_label)
 			new_label = new_label or f"inv_{edge_label}"
-			self.edges[new_label] = inverted
+			self._set_edges(new_label, inverted)
 
 	def compose_edges(self, edge_label1, edge_label2, new_label=None):
 		"""
@@ -117,8 +479,27 @@ class Graph:
 		"""
 		if edge_label1 in self.edges and edge_label2 in self.edges:
 			new_label = new_label or f"{edge_label1}_{edge_label2}"
-			composed = compose(self.edges[edge_label1], self.edges[edge_label2], new_label)
-			self.edges[new_label] = composed
+			composed = compose(self.edges[edge_label1], self.edges[edge_label2], new_label,
+			                   index=self._get_src_index(edge_label2))
+			self._set_edges(new_label, composed)
+
+	def batch_compose(self, pairs):
+		"""
+		Composes several pairs of edge labels and saves each result under its new label.
+		All pairs are composed from the edges as they are before the batch, so a pair does not see the result
+		of another pair in the same batch.
+
+		Args:
+			pairs (list): A list of (edge_label1, edge_label2, new_label) tuples. new_label may be None.
+		"""
+		jobs = [(new_label or f"{edge_label1}_{edge_label2}", edge_label1, edge_label2)
+		        for edge_label1, edge_label2, new_label in pairs
+		        if edge_label1 in self.edges and edge_label2 in self.edges]
+		results = [compose(self.edges[edge_label1], self.edges[edge_label2], new_label,
+		                   index=self._get_src_index(edge_label2))
+		           for new_label, edge_label1, edge_label2 in jobs]
+		for (new_label, _, _), composed in zip(jobs, results):
+			self._set_edges(new_label, composed)
 
 	def lift_edges(self, edge_label1, edge_label2, new_label=None):
 		"""
@@ -130,28 +511,118 @@ class Graph:
 			new_label (str, optional): The label for the lifted edges. Defaults to None.
 		"""
 		if edge_label1 in self.edges and edge_label2 in self.edges:
-			lifted = lift(self.edges[edge_label1], self.edges[edge_label2], new_label)
+			lifted = lift(self.edges[edge_label1], self.edges[edge_label2], new_label,
+			              index=self._get_src_index(edge_label2))
 			new_label = new_label or f"lifted_{edge_label1}_{edge_label2}"
-			self.edges[new_label] = lifted
+			self._set_edges(new_label, lifted)
+
+	def reduced_closure(self, edge_label, new_label=None):
+		"""
+		Computes the transitive closure of the edges with the specified label and saves it under a new label.
+		Cycles are collapsed into their strongly connected components first, so the closure is propagated
+		over the condensed acyclic graph.
+
+		Args:
+			edge_label (str): The label of the edges to close.
+			new_label (str, optional): The label for the closure edges. Defaults to None.
+		"""
+		if edge_label in self.edges:
+			new_label = new_label or f"closure_{edge_label}"
+			self._set_edges(new_label, self._closure(edge_label, new_label))
+
+	def _closure(self, edge_label, new_label):
+		"""
+		Computes the transitive closure of the edges with the specified label.
+
+		Args:
+			edge_label (str): The label of the edges to close.
+			new_label (str): The label for the closure edges.
+
+		Returns:
+			list, EdgeList: A list of closure edges.
+		"""
+		edge_list = self.edges[edge_label]
+		if isinstance(edge_list, EdgeList):
+			pairs = _closure_pairs(edge_list.sources, edge_list.targets)
+			return EdgeList(sources=[source for source, _ in pairs],
+			                targets=[target for _, target in pairs],
+			                labels=[new_label] * len(pairs))
+		pairs = _closure_pairs([edge['source'] for edge in edge_list], [edge['target'] for edge in edge_list])
+		return [{'source': source, 'target': target, 'label': new_label} for source, target in pairs]
+
+	def lift_closure(self, edge_label1, edge_label2, new_label=None):
+		"""
+		Lifts the transitive closure of the edges with the second label through the edges with the first label,
+		then saves the result under a new label.
+
+		Args:
+			edge_label1 (str): The label of the first list of edges.
+			edge_label2 (str): The label of the edges whose closure is lifted.
+			new_label (str, optional): The label for the lifted edges. Defaults to None.
+		"""
+		if edge_label1 in self.edges and edge_label2 in self.edges:
+			closure_label = f"closure_{edge_label2}"
+			lifted = lift(self.edges[edge_label1], self._closure(edge_label2, closure_label), new_label)
+			new_label = new_label or f"lifted_{edge_label1}_{closure_label}"
+			self._set_edges(new_label, lifted)
 
 	def filter_nodes_by_labels(self, labels):
 		"""
 		Filters nodes by the specified labels.
 
 		Args:
-			labels (list, set): A list of labels to filter nodes by.
+			labels (str, list, set): A label, or a list of labels, to filter nodes by.
 
 		Returns:
 			dict: A dictionary of filtered nodes.
 		"""
-		filtered_nodes = {}
-		for key, node in self.nodes.items():
-			if any(label in labels for label in node['labels']):
-				filtered_nodes[key] = node
-		return filtered_nodes
+		labels = frozenset((labels,) if isinstance(labels, str) else labels)
+		buckets = [self._nodes_by_label[label] for label in labels if label in self._nodes_by_label]
+		if len(buckets) <= 1:
+			# a single bucket is already the result, so there is nothing worth caching
+			return dict(buckets[0]) if buckets else {}
+		merged = self._bucket_cache.get(labels)
+		if merged is None:
+			merged = self._merge_buckets(labels)
+			if len(self._bucket_cache) >= _BUCKET_CACHE_SIZE:
+				del self._bucket_cache[next(iter(self._bucket_cache))]
+			self._bucket_cache[labels] = merged
+		return dict(merged)
+
+	def _merge_buckets(self, labels):
+		"""
+		Merges the node buckets of the specified labels. The nodes do not change after initialization,
+		so filter_nodes_by_labels caches the result per label set and returns copies of it.
+
+		Args:
+			labels (frozenset): The labels to merge the buckets of.
+
+		Returns:
+			dict: A dictionary of the nodes having any of the labels.
+		"""
+		node_ids = set().union(*(self._nodes_by_label[label] for label in labels if label in self._nodes_by_label))
+		# in node order, so that the result does not depend on the iteration order of the label set
+		return {node_id: node for node_id, node in self.nodes.items() if node_id in node_ids}
+
+	def _mask_labels(self, mask):
+		"""
+		Decodes a label bitmask into the labels it contains.
+
+		Args:
+			mask (int): A bitmask over the interned node labels.
+
+		Returns:
+			list: The labels whose bits are set.
+		"""
+		labels = []
+		while mask:
+			lowest = mask & -mask
+			labels.append(self._label_pool[lowest.bit_length() - 1])
+			mask ^= lowest
+		return labels
 
 	def get_all_node_labels(self):
-		return {label for _, node in self.nodes.items() for label in node['labels']}
+		return set(self._nodes_by_label)
 
 	def get_all_edge_labels(self):
 		return set(self.edges.keys())
@@ -165,13 +636,16 @@ class Graph:
 			node_label (str): The label of the nodes to filter by.
 
 		Returns:
-			list: A list of edges that match the criteria.
+			list, EdgeList: A list of edges that match the criteria.
 		"""
 		if edge_label in self.edges:
-			return [edge for edge in self.edges[edge_label] if
-			        node_label in self.nodes[edge['source']].get('labels', []) and node_label in self.nodes[
-				        edge['target']].get('labels', [])]
-		return []
+			bucket = self._nodes_by_label.get(node_label, {})
+			edge_list = self.edges[edge_label]
+			if isinstance(edge_list, EdgeList):
+				rows = [row for row in _edge_rows(edge_list) if row[0] in bucket and row[1] in bucket]
+				return EdgeList(*map(list, zip(*rows))) if rows else EdgeList()
+			return [edge for edge in edge_list if edge['source'] in bucket and edge['target'] in bucket]
+		return EdgeList() if self.compact else []
 
 	def get_edge_node_labels(self, edge):
 		"""
@@ -185,29 +659,63 @@ class Graph:
 		"""
 		src_labels = self.nodes.get(edge['source'], {}).get('labels', [])
 		tgt_labels = self.nodes.get(edge['target'], {}).get('labels', [])
+		if len(src_labels) == 1 and len(tgt_labels) == 1:
+			# typed graphs: a single pair, no product needed
+			(src_label,), (tgt_label,) = src_labels, tgt_labels
+			return [(src_label, tgt_label)]
 		return [(src_label, tgt_label) for src_label in src_labels for tgt_label in tgt_labels]
 
+	def _label_pairs(self, edge_list, pair_cache):
+		"""
+		Gets the set of source and target label pairs for a list of edges. Each edge is keyed by its endpoints'
+		label masks packed into a single int, and the label product is computed once per distinct key.
+
+		Args:
+			edge_list (list, EdgeList): The list of edges to retrieve labels for.
+			pair_cache (dict): The label products computed so far, by packed key. Updated in place.
+
+		Returns:
+			set: A set of source and target labels.
+		"""
+		masks = self._node_masks
+		width = len(self._label_pool)
+		if isinstance(edge_list, EdgeList):
+			keys = {masks.get(source, 0) << width | masks.get(target, 0)
+			        for source, target in zip(edge_list.sources, edge_list.targets)}
+		else:
+			keys = {masks.get(edge['source'], 0) << width | masks.get(edge['target'], 0) for edge in edge_list}
+		for key in keys:
+			if key not in pair_cache:
+				src_labels = self._mask_labels(key >> width)
+				tgt_labels = self._mask_labels(key & ((1 << width) - 1))
+				pair_cache[key] = {(src_label, tgt_label) for src_label in src_labels for tgt_label in tgt_labels}
+		return set().union(*(pair_cache[key] for key in keys))
+
 	def get_source_and_target_labels(self, edge_label):
 		"""
-		Gets the set of source and target labels for a given list of edges.
+		Gets the set of source and target labels for the edges with the specified label.
 
 		Args:
-			edge_list (list): The list of edges to retrieve labels for.
+			edge_label (str): The label of the edges to retrieve labels for.
 
 		Returns:
 			set: A set of source and target labels.
 		"""
-		edge_node_labels = {label for edge in self.edges[edge_label] for label in self.get_edge_node_labels(edge)}
-		return edge_node_labels
+		edge_list = self.edges[edge_label]
+		cached = self._ontology.get(edge_label)
+		if cached is None or cached[0] is not edge_list:
+			cached = self._ontology[edge_label] = (edge_list, self._label_pairs(edge_list, self._pair_cache))
+		return set(cached[1])
 
 	def generate_ontology(self):
 		"""
-		Generates the ontology from the graph's edges and nodes.
+		Generates the ontology from the graph's edges and nodes. Entries are kept between calls and only
+		recomputed for labels assigned a new edge list since.
 
 		Returns:
 			dict: A dictionary representing the ontology.
 		"""
-		return {label: self.get_source_and_target_labels(edges) for label, edges in self.edges.items()}
+		return {edge_label: self.get_source_and_target_labels(edge_label) for edge_label in self.edges}
 
 	def to_dict(self, *args, node_labels=None):
 		included_edge_labels = list(args) if args else list(self.edges.keys())
@@ -216,19 +724,21 @@ class Graph:
 			included_node_labels = self.get_all_node_labels()
 		else:
 			# include nodes that are involved with the included edges
-			included_node_labels = {node_label for edge_label in included_edge_labels for node_label in
-			                        self.get_source_and_target_labels(edge_label)}
+			included_node_labels = {node_label for edge_label in included_edge_labels for label_pair in
+			                        self.get_source_and_target_labels(edge_label) for node_label in label_pair}
 			# additional nodes as specified in the argument
 			if isinstance(node_labels, str):
 				included_node_labels.add(node_labels)
 			elif isinstance(node_labels, Iterable):
-				included_node_labels += node_labels
+				included_node_labels |= set(node_labels)
 
 		included_nodes = self.filter_nodes_by_labels(included_node_labels)
 		included_edges = {label: edge_list for label, edge_list in self.edges.items() if label in included_edge_labels}
 		return {
 			"elements": {
 				"nodes": [{"data": node} for node in list(included_nodes.values())],
-				"edges": [{"data": edge} for edge in sum(list(included_edges.values()), [])]
+				"edges": [{"data": edge} for edge in chain.from_iterable(
+					edge_list.to_dicts() if isinstance(edge_list, EdgeList) else edge_list
+					for edge_list in included_edges.values())]
 			}
 		}
@@ -1,10 +1,14 @@
 import sys
 import os
+import copy
+import json
+import pickle
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
 import unittest
-from arcanalib import Graph, invert, compose, lift
+from arcanalib import Graph, EdgeList, invert, compose, lift
 
 class TestGraphFunctions(unittest.TestCase):
 
@@ -42,6 +46,22 @@ class TestGraphFunctions(unittest.TestCase):
                     {"source": "B1", "target": "A1", "label": "inv_invokes"}]
         self.assertEqual(inverted, expected)
 
+    def test_invert_edge_list(self):
+        edges = EdgeList(sources=["A", "A1"], targets=["A1", "B1"], labels=["contains", "invokes"])
+        inverted = invert(edges)
+        expected = EdgeList(sources=["A1", "B1"], targets=["A", "A1"], labels=["inv_contains", "inv_invokes"])
+        self.assertEqual(inverted, expected)
+        self.assertEqual(edges.sources, ["A", "A1"])
+
+    def test_invert_inplace(self):
+        edges = [{"source": "A", "target": "A1", "label": "contains", "weight": 1}]
+        inverted = invert(edges, inplace=True)
+        self.assertIs(inverted, edges)
+        self.assertEqual(edges, [{"source": "A1", "target": "A", "label": "inv_contains", "weight": 1}])
+        edge_list = EdgeList(sources=["A"], targets=["A1"], labels=["contains"])
+        self.assertIs(invert(edge_list, "contained_by", inplace=True), edge_list)
+        self.assertEqual(edge_list, EdgeList(sources=["A1"], targets=["A"], labels=["contained_by"]))
+
     def test_compose_contains_invokes(self):
         edges1 = [{"source": "A", "target": "A1", "label": "contains"}]
         edges2 = [{"source": "A1", "target": "B1", "label": "invokes"}]
@@ -49,6 +69,30 @@ class TestGraphFunctions(unittest.TestCase):
         expected = [{"source": "A", "target": "B1", "label": "contains_invokes"}]
         self.assertEqual(composed, expected)
 
+    def test_compose_multi_edges(self):
+        edges1 = [{"source": "A", "target": "A1", "label": "contains"}]
+        edges2 = [{"source": "A1", "target": "B1", "label": "invokes"},
+                  {"source": "A1", "target": "C1", "label": "invokes"}]
+        composed = compose(edges1, edges2)
+        expected = [{"source": "A", "target": "B1", "label": "contains,invokes"},
+                    {"source": "A", "target": "C1", "label": "contains,invokes"}]
+        self.assertEqual(composed, expected)
+
+    def test_compose_edge_list(self):
+        edges1 = EdgeList(sources=["A", "B"], targets=["A1", "B1"], labels=["contains", "contains"])
+        edges2 = EdgeList(sources=["A1", "A1"], targets=["B1", "C1"], labels=["invokes", "invokes"])
+        composed = compose(edges1, edges2)
+        expected = EdgeList(sources=["A", "A"], targets=["B1", "C1"], labels=["contains,invokes", "contains,invokes"])
+        self.assertEqual(composed, expected)
+        self.assertEqual(compose(edges2, edges1), EdgeList())
+
+    def test_compose_mixed_edge_types(self):
+        edges1 = [{"source": "A", "target": "A1", "label": "contains"}]
+        edges2 = EdgeList(sources=["A1"], targets=["B1"], labels=["invokes"])
+        composed = compose(edges1, edges2)
+        expected = [{"source": "A", "target": "B1", "label": "contains,invokes"}]
+        self.assertEqual(composed, expected)
+
     def test_lift_contains_invokes(self):
         edges1 = [{"source": "A", "target": "A1", "label": "contains"},
                   {"source": "B", "target": "B1", "label": "contains"}]
@@ -57,6 +101,21 @@ class TestGraphFunctions(unittest.TestCase):
         expected = [{"source": "A", "target": "B", "label": "calls"}]
         self.assertEqual(lifted, expected)
 
+    def test_lift_default_label(self):
+        edges1 = [{"source": "A", "target": "A1", "label": "contains"},
+                  {"source": "B", "target": "B1", "label": "contains"}]
+        edges2 = [{"source": "A1", "target": "B1", "label": "invokes"}]
+        lifted = lift(edges1, edges2)
+        expected = [{"source": "A", "target": "B", "label": "contains,invokes,inv_contains"}]
+        self.assertEqual(lifted, expected)
+
+    def test_lift_edge_list(self):
+        edges1 = [{"source": "A", "target": "A1", "label": "contains"},
+                  {"source": "B", "target": "B1", "label": "contains"}]
+        edges2 = [{"source": "A1", "target": "B1", "label": "invokes"}]
+        lifted = lift(EdgeList.from_dicts(edges1), EdgeList.from_dicts(edges2), "calls")
+        self.assertEqual(lifted.to_dicts(), lift(edges1, edges2, "calls"))
+
     def test_graph_invert_edges(self):
         self.graph.invert_edges("contains", "inv_contains")
         inverted_edges = self.graph.edges["inv_contains"]
@@ -73,6 +132,36 @@ class TestGraphFunctions(unittest.TestCase):
                     {"source": "C", "target": "C2", "label": "contains_invokes"}]
         self.assertEqual(composed_edges, expected)
 
+    def test_graph_compose_refreshes_stale_index(self):
+        self.graph.compose_edges("contains", "invokes", "contains_invokes")
+        self.graph.invert_edges("contains", "invokes")
+        self.graph.compose_edges("contains", "invokes", "contains_invokes")
+        composed_edges = self.graph.edges["contains_invokes"]
+        expected = [{"source": "A", "target": "A", "label": "contains_invokes"},
+                    {"source": "B", "target": "B", "label": "contains_invokes"},
+                    {"source": "C", "target": "C", "label": "contains_invokes"},
+                    {"source": "C", "target": "C", "label": "contains_invokes"}]
+        self.assertEqual(composed_edges, expected)
+
+    def test_graph_compose_after_direct_assignment(self):
+        self.graph.compose_edges("contains", "invokes", "contains_invokes")
+        self.graph.edges["invokes"] = [{"source": "A1", "target": "A", "label": "invokes"}]
+        self.graph.compose_edges("contains", "invokes", "contains_invokes")
+        expected = [{"source": "A", "target": "A", "label": "contains_invokes"}]
+        self.assertEqual(self.graph.edges["contains_invokes"], expected)
+
+    def test_graph_batch_compose(self):
+        self.graph.invert_edges("contains")
+        self.graph.batch_compose([("contains", "invokes", "contains_invokes"),
+                                  ("invokes", "inv_contains", None),
+                                  ("contains", "missing", "skipped"),
+                                  ("contains_invokes", "inv_contains", "unseen")])
+        expected = Graph(self.graph_data)
+        expected.invert_edges("contains")
+        expected.compose_edges("contains", "invokes", "contains_invokes")
+        expected.compose_edges("invokes", "inv_contains")
+        self.assertEqual(self.graph.edges, expected.edges)
+
     def test_graph_lift_edges(self):
         self.graph.lift_edges("contains", "invokes", "calls")
         lifted_edges = self.graph.edges["calls"]
@@ -80,6 +169,36 @@ class TestGraphFunctions(unittest.TestCase):
                     {"source": "C", "target": "C", "label": "calls"}]
         self.assertEqual(lifted_edges, expected)
 
+    def test_graph_reduced_closure(self):
+        graph = Graph({
+            "elements": {
+                "nodes": [{"data": {"id": node_id, "labels": ["method"]}} for node_id in ["A1", "B1", "C1", "D1"]],
+                "edges": [
+                    {"data": {"source": "A1", "target": "B1", "label": "invokes"}},
+                    {"data": {"source": "B1", "target": "C1", "label": "invokes"}},
+                    {"data": {"source": "C1", "target": "B1", "label": "invokes"}},
+                    {"data": {"source": "C1", "target": "D1", "label": "invokes"}}
+                ]
+            }
+        })
+        graph.reduced_closure("invokes")
+        pairs = {(edge["source"], edge["target"]) for edge in graph.edges["closure_invokes"]}
+        expected = {("A1", "B1"), ("A1", "C1"), ("A1", "D1"),
+                    ("B1", "B1"), ("B1", "C1"), ("B1", "D1"),
+                    ("C1", "B1"), ("C1", "C1"), ("C1", "D1")}
+        self.assertEqual(pairs, expected)
+        self.assertEqual(len(graph.edges["closure_invokes"]), len(expected))
+        self.assertTrue(all(edge["label"] == "closure_invokes" for edge in graph.edges["closure_invokes"]))
+
+    def test_graph_lift_closure(self):
+        self.graph_data["elements"]["edges"].append(
+            {"data": {"source": "B1", "target": "C1", "label": "invokes"}})
+        graph = Graph(self.graph_data)
+        graph.lift_closure("contains", "invokes", "calls")
+        pairs = {(edge["source"], edge["target"]) for edge in graph.edges["calls"]}
+        self.assertEqual(pairs, {("A", "B"), ("A", "C"), ("B", "C"), ("C", "C")})
+        self.assertNotIn("closure_invokes", graph.edges)
+
     def test_filter_nodes_by_labels(self):
         filtered_nodes = self.graph.filter_nodes_by_labels(["class"])
         expected = {"A": {"id": "A", "labels": ["class"]},
@@ -87,12 +206,56 @@ class TestGraphFunctions(unittest.TestCase):
                     "C": {"id": "C", "labels": ["class"]}}
         self.assertEqual(filtered_nodes, expected)
 
+    def test_filter_nodes_by_multiple_labels(self):
+        filtered_nodes = self.graph.filter_nodes_by_labels({"method", "field"})
+        self.assertEqual(set(filtered_nodes), {"A1", "B1", "C1", "C2"})
+        self.assertEqual(self.graph.filter_nodes_by_labels(["field"]), {})
+
+    def test_filter_nodes_by_single_label_string(self):
+        self.assertEqual(self.graph.filter_nodes_by_labels("class"), self.graph.filter_nodes_by_labels(["class"]))
+        self.assertEqual(set(self.graph.filter_nodes_by_labels("class")), {"A", "B", "C"})
+
+    def test_filter_nodes_by_labels_keeps_node_order(self):
+        graph = Graph({
+            "elements": {
+                "nodes": [
+                    {"data": {"id": "A", "labels": ["method"]}},
+                    {"data": {"id": "B", "labels": ["class"]}},
+                    {"data": {"id": "C", "labels": ["method"]}}
+                ],
+                "edges": []
+            }
+        })
+        self.assertEqual(list(graph.filter_nodes_by_labels(["class", "method"])), ["A", "B", "C"])
+        self.assertEqual(list(graph.filter_nodes_by_labels(["class", None])), ["B"])
+
+    def test_filter_nodes_by_labels_repeated(self):
+        filtered_nodes = self.graph.filter_nodes_by_labels(["class"])
+        filtered_nodes.pop("A")
+        self.assertEqual(set(self.graph.filter_nodes_by_labels({"class"})), {"A", "B", "C"})
+
+    def test_graph_pickle_and_deepcopy(self):
+        self.graph.filter_nodes_by_labels(["class", "method"])
+        for graph in (pickle.loads(pickle.dumps(self.graph)), copy.deepcopy(self.graph)):
+            filtered_nodes = graph.filter_nodes_by_labels(["class", "method"])
+            self.assertEqual(filtered_nodes, self.graph.nodes)
+            self.assertIs(filtered_nodes["A"], graph.nodes["A"])
+            self.assertIsNot(filtered_nodes["A"], self.graph.nodes["A"])
+
     def test_get_edges_with_node_labels(self):
         edges_with_labels = self.graph.get_edges_with_node_labels("invokes", "method")
         expected = [{'source': 'A1', 'target': 'B1', 'label': 'invokes'},
                     {'source': 'C1', 'target': 'C2', 'label': 'invokes'}]
         self.assertEqual(edges_with_labels, expected)
 
+    def test_get_edge_node_labels(self):
+        edge = {"source": "A", "target": "A1", "label": "contains"}
+        self.assertEqual(self.graph.get_edge_node_labels(edge), [("class", "method")])
+        self.graph_data["elements"]["nodes"][0]["data"]["labels"] = ["class", "type"]
+        graph = Graph(self.graph_data)
+        self.assertEqual(graph.get_edge_node_labels(edge), [("class", "method"), ("type", "method")])
+        self.assertEqual(self.graph.get_edge_node_labels({"source": "X", "target": "A1"}), [])
+
     def test_generate_ontology(self):
         ontology = self.graph.generate_ontology()
         expected = {
@@ -101,5 +264,72 @@ class TestGraphFunctions(unittest.TestCase):
         }
         self.assertEqual(ontology, expected)
 
+    def test_generate_ontology_multi_labels(self):
+        graph = Graph({
+            "elements": {
+                "nodes": [
+                    {"data": {"id": "A", "labels": ["class", "type"]}},
+                    {"data": {"id": "A1", "labels": ["method"]}},
+                    {"data": {"id": "B1", "labels": ["method"]}}
+                ],
+                "edges": [
+                    {"data": {"source": "A", "target": "A1", "label": "contains"}},
+                    {"data": {"source": "A", "target": "B1", "label": "contains"}}
+                ]
+            }
+        })
+        expected = {"contains": {("class", "method"), ("type", "method")}}
+        self.assertEqual(graph.generate_ontology(), expected)
+
+    def test_generate_ontology_after_mutation(self):
+        self.graph.generate_ontology()
+        self.graph.invert_edges("contains", "invokes")
+        self.graph.compose_edges("contains", "contains", "nested")
+        ontology = self.graph.generate_ontology()
+        expected = {
+            "contains": {("class", "method")},
+            "invokes": {("method", "class")},
+            "nested": set()
+        }
+        self.assertEqual(ontology, expected)
+
+    def test_generate_ontology_after_direct_assignment(self):
+        self.graph.to_dict()
+        self.graph.edges["invokes"] = [{"source": "A", "target": "A1", "label": "invokes"}]
+        self.assertEqual(self.graph.get_source_and_target_labels("invokes"), {("class", "method")})
+        self.assertEqual(self.graph.generate_ontology()["invokes"], {("class", "method")})
+
+    def test_to_dict(self):
+        exported = self.graph.to_dict("invokes", node_labels=["class"])
+        node_ids = {node["data"]["id"] for node in exported["elements"]["nodes"]}
+        self.assertEqual(node_ids, {"A", "B", "C", "A1", "B1", "C1", "C2"})
+        self.assertEqual([edge["data"] for edge in exported["elements"]["edges"]], self.graph.edges["invokes"])
+
+    def test_graph_from_json_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "graph.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.graph_data, f)
+            graph = Graph.from_json_file(path)
+        self.assertEqual(graph.nodes, self.graph.nodes)
+        self.assertEqual(graph.edges, self.graph.edges)
+        self.assertIs(graph.edges["invokes"][0]["source"], graph.nodes["A1"]["id"])
+
+    def test_compact_graph(self):
+        compact = Graph(self.graph_data, compact=True)
+        self.assertIsInstance(compact.edges["contains"], EdgeList)
+        for graph in (self.graph, compact):
+            graph.invert_edges("contains")
+            graph.compose_edges("contains", "invokes", "contains_invokes")
+            graph.lift_edges("contains", "invokes", "calls")
+            graph.reduced_closure("invokes")
+            graph.lift_closure("contains", "invokes", "calls_closure")
+        for label, edge_list in compact.edges.items():
+            self.assertEqual(edge_list.to_dicts(), self.graph.edges[label])
+        self.assertEqual(compact.get_edges_with_node_labels("invokes", "method").to_dicts(),
+                         self.graph.get_edges_with_node_labels("invokes", "method"))
+        self.assertEqual(compact.generate_ontology(), self.graph.generate_ontology())
+        self.assertEqual(compact.to_dict(), self.graph.to_dict())
+
 if __name__ == '__main__':
     unittest.main()